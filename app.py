@@ -1,9 +1,11 @@
 import streamlit as st
 import preprocessor
 import helper
+import interaction
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
+import io
 
 # Set page config
 st.set_page_config(page_title="WhatsApp Chat Analyzer", page_icon="💬", layout="wide")
@@ -57,12 +59,129 @@ st.sidebar.markdown("""
 5. Upload the .txt file here
 """)
 
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_interactions(df, gap_minutes):
+    # Sessions, reply latency, reply matrix and streaks are computed once per chat and gap.
+    # Each slider value stores its own copy, so only the most recent few are kept.
+    return interaction.compute_interactions(df, gap_minutes)
+
+@st.cache_resource(show_spinner=False, max_entries=4, ttl=3600)
+def load_sketches(bytes_data):
+    # Decode and parse line by line so only fixed-size sketches are kept, never a full DataFrame.
+    # cache_resource keeps the live sketches instead of storing an extra pickled copy; they are never mutated.
+    # The cache is shared by every session, so only a few recent uploads are kept.
+    lines = io.TextIOWrapper(io.BytesIO(bytes_data), encoding='utf-8')
+    return helper.sketch_chat(preprocessor.stream_messages(lines))
+
 uploaded_file = st.sidebar.file_uploader("Choose a WhatsApp chat file", type=['txt'])
+approximate_mode = st.sidebar.checkbox("⚡ Approximate mode (large chats)",
+                                       help="Uses bounded-memory sketches instead of exact counts. Only statistics, words and emojis are shown.")
 
 if uploaded_file is not None:
     try:
         # Read and decode file
         bytes_data = uploaded_file.getvalue()
+
+        if approximate_mode:
+            with st.spinner('Streaming chat into sketches...'):
+                overall, sketches = load_sketches(bytes_data)
+
+            if not sketches:
+                st.markdown('<div class="error-message">❌ <strong>Error:</strong> Could not process the chat file. Please make sure you uploaded a valid WhatsApp chat export file.</div>', unsafe_allow_html=True)
+                st.stop()
+
+            st.markdown(f'<div class="info-message">⚡ <strong>Approximate mode:</strong> Streamed {overall.messages} messages into bounded-memory sketches.</div>', unsafe_allow_html=True)
+
+            user_list = sorted(user for user in sketches if user != 'group_notification')
+            user_list.insert(0, "Overall")
+            selected_user = st.sidebar.selectbox("👤 Show analysis for:", user_list)
+            analyze_button = st.sidebar.button("🚀 Start Analysis", type="primary")
+
+            if analyze_button:
+                sketch = helper.select_sketch(selected_user, overall, sketches)
+                num_messages, words, num_media_messages, num_links, distinct_words, distinct_links = helper.approx_fetch_stats(sketch)
+                bounds = sketch.error_bounds()
+
+                st.markdown("## 📈 Top Statistics")
+                col1, col2, col3, col4, col5, col6 = st.columns(6)
+                with col1:
+                    st.metric("Total Messages", num_messages)
+                with col2:
+                    st.metric("Total Words", words)
+                with col3:
+                    st.metric("Media Shared", num_media_messages)
+                with col4:
+                    st.metric("Links Shared", num_links)
+                with col5:
+                    st.metric("Distinct Words ≈", distinct_words)
+                with col6:
+                    st.metric("Distinct Links ≈", distinct_links)
+
+                words_confidence = "guaranteed" if bounds['top_words_confidence'] == 1 else f"{bounds['top_words_confidence']:.0%} confidence"
+                emojis_confidence = "guaranteed" if bounds['top_emojis_confidence'] == 1 else f"{bounds['top_emojis_confidence']:.0%} confidence"
+
+                st.caption(
+                    f"Message, word, media and link totals are exact. "
+                    f"Distinct counts use HyperLogLog (±{bounds['distinct']:.1%} standard error). "
+                    f"Word and emoji counts are never too low; words overcount by at most {bounds['top_words']:.0f} "
+                    f"({words_confidence}) and emojis by at most {bounds['top_emojis']:.0f} "
+                    f"({emojis_confidence}). "
+                    f"The word cloud is drawn from a uniform sample of {bounds['sample_size']} of {bounds['sampled_from']} words."
+                )
+
+                st.markdown("## 💬 Word Analysis")
+                col1, col2 = st.columns([1, 1])
+
+                with col1:
+                    st.markdown("### 🔤 Most Common Words")
+                    most_common_df = helper.approx_most_common_words(sketch)
+                    if not most_common_df.empty:
+                        fig, ax = plt.subplots(figsize=(8, 10))
+                        top_words = most_common_df.head(15)
+                        # Counts can only be overestimates, so the error bar extends to the left only
+                        ax.barh(top_words[0], top_words[1], xerr=[top_words[2], [0] * len(top_words)], color='#3498DB')
+                        ax.set_xlabel('Estimated Frequency')
+                        ax.set_ylabel('Words')
+                        plt.tight_layout()
+                        st.pyplot(fig)
+                    else:
+                        st.info("📊 No common words data available")
+
+                with col2:
+                    st.markdown("### ☁️ Word Cloud")
+                    df_wc = helper.approx_wordcloud(sketch)
+                    if df_wc is not None:
+                        fig, ax = plt.subplots(figsize=(8, 8))
+                        ax.imshow(df_wc, interpolation='bilinear')
+                        ax.axis('off')
+                        plt.tight_layout()
+                        st.pyplot(fig)
+                    else:
+                        st.info("☁️ No word cloud data available")
+
+                st.markdown("## 😊 Emoji Analysis")
+                emoji_df = helper.approx_emoji_helper(sketch)
+                if not emoji_df.empty:
+                    col1, col2 = st.columns([1, 1])
+
+                    with col1:
+                        st.markdown("### 📊 Emoji Usage")
+                        st.dataframe(emoji_df.head(10).rename(columns={0: 'emoji', 1: 'estimate', 2: 'max overcount'}), use_container_width=True)
+
+                    with col2:
+                        st.markdown("### 🥧 Top Emojis Distribution")
+                        fig, ax = plt.subplots(figsize=(8, 8))
+                        top_emojis = emoji_df.head(5)
+                        colors = ['#FFD700', '#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4']
+                        ax.pie(top_emojis[1], labels=top_emojis[0], autopct='%1.1f%%',
+                               colors=colors, startangle=90, textprops={'fontsize': 12})
+                        plt.tight_layout()
+                        st.pyplot(fig)
+                else:
+                    st.info("😊 No emoji data available")
+
+            st.stop()
+
         data = bytes_data.decode("utf-8")
         
         # Show loading spinner
@@ -96,6 +215,10 @@ if uploaded_file is not None:
 
         # User selection
         selected_user = st.sidebar.selectbox("👤 Show analysis for:", user_list)
+
+        # Inactivity gap that splits the chat into conversations
+        session_gap = st.sidebar.slider("⏱️ Conversation gap (minutes):", min_value=5, max_value=480,
+                                        value=interaction.DEFAULT_SESSION_GAP, step=5)
         
         # Add analyze button
         analyze_button = st.sidebar.button("🚀 Start Analysis", type="primary")
@@ -241,6 +364,74 @@ if uploaded_file is not None:
                             st.markdown("#### Percentage Breakdown")
                             st.dataframe(new_df, use_container_width=True)
 
+                # Interaction Analysis
+                st.markdown("## 🔁 Interaction Analysis")
+                if df.attrs.get('synthetic_dates'):
+                    # Reply times and streaks are meaningless without real timestamps
+                    st.info("📊 Interaction analysis is unavailable because the message dates could not be parsed")
+                else:
+                    interactions = load_interactions(df[['date', 'user']], session_gap)
+                    sessions = interactions['sessions']
+                    latency = interactions['latency']
+                    matrix = interactions['matrix']
+                    streaks = interactions['streaks']
+
+                    if selected_user != 'Overall' and not sessions.empty:
+                        sessions = sessions[sessions['initiator'] == selected_user]
+
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        st.metric("Conversations Started" if selected_user != 'Overall' else "Conversations", len(sessions))
+                    with col2:
+                        avg_length = round(sessions['messages'].mean(), 1) if not sessions.empty else 0
+                        st.metric("Avg Messages / Conversation", avg_length)
+                    with col3:
+                        if selected_user != 'Overall':
+                            reply_time = latency['median_min'].get(selected_user) if not latency.empty else None
+                        else:
+                            reply_time = interactions['median_reply']
+                        st.metric("Median Reply Time (min)", round(reply_time, 1) if pd.notna(reply_time) else "-")
+                    with col4:
+                        if streaks.empty:
+                            longest = 0
+                        elif selected_user != 'Overall':
+                            longest = int(streaks['longest_streak'].get(selected_user, 0))
+                        else:
+                            longest = int(streaks['longest_streak'].max())
+                        st.metric("Longest Daily Streak", longest)
+
+                    # The charts below always cover the whole chat; the selected user is highlighted
+                    col1, col2 = st.columns([1, 1])
+
+                    with col1:
+                        st.markdown("### ⏳ Reply Latency (all participants)")
+                        if not latency.empty:
+                            fig, ax = plt.subplots(figsize=(8, 6))
+                            colors = ['#E74C3C' if user == selected_user else '#9B59B6' for user in latency.index]
+                            ax.barh(latency.index, latency['median_min'], color=colors)
+                            ax.set_xlabel('Median Reply Time (minutes)')
+                            ax.set_ylabel('Users')
+                            plt.tight_layout()
+                            st.pyplot(fig)
+                        else:
+                            st.info("📊 No reply data available")
+
+                    with col2:
+                        st.markdown("### 🔄 Who Replies to Whom (whole chat)")
+                        if not matrix.empty:
+                            fig, ax = plt.subplots(figsize=(8, 6))
+                            sns.heatmap(matrix, annot=True, fmt='d', cmap='Greens', ax=ax)
+                            ax.set_xlabel('Replied To')
+                            ax.set_ylabel('Replier')
+                            plt.tight_layout()
+                            st.pyplot(fig)
+                        else:
+                            st.info("📊 No reply data available")
+
+                    if not streaks.empty:
+                        st.markdown("#### 🔥 Daily Activity Streaks (all participants)")
+                        st.dataframe(streaks, use_container_width=True)
+
                 # Word Analysis
                 st.markdown("## 💬 Word Analysis")
                 
@@ -322,8 +513,10 @@ else:
     - 🗺️ **Activity Maps** - Busiest days and months
     - 🔥 **Heatmaps** - Hour-wise activity throughout the week
     - 👥 **User Analysis** - Most active participants
+    - 🔁 **Interaction Analysis** - Conversations, reply times, reply matrix and activity streaks
     - 💬 **Word Analysis** - Most common words and word clouds
     - 😊 **Emoji Analysis** - Most used emojis and distributions
+    - ⚡ **Approximate Mode** - Bounded-memory sketches for very large chats
     
     ### 🚀 Get Started:
     1. Export your WhatsApp chat (without media)
@@ -4,6 +4,7 @@ import pandas as pd
 from collections import Counter
 import emoji
 import os
+from sketches import ChatSketch
 
 extract = URLExtract()
 
@@ -128,6 +129,25 @@ def most_common_words(selected_user, df):
     most_common_df = pd.DataFrame(Counter(words).most_common(20))
     return most_common_df
 
+def extract_emojis(message):
+    # Updated emoji detection for newer emoji library versions
+    try:
+        return [c for c in str(message) if c in emoji.EMOJI_DATA]
+    except:
+        # Fallback for older versions
+        try:
+            return [c for c in str(message) if c in emoji.UNICODE_EMOJI['en']]
+        except:
+            # Simple emoji detection as fallback
+            import re
+            emoji_pattern = re.compile("["
+                u"\U0001F600-\U0001F64F"  # emoticons
+                u"\U0001F300-\U0001F5FF"  # symbols & pictographs
+                u"\U0001F680-\U0001F6FF"  # transport & map symbols
+                u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
+                "]+", flags=re.UNICODE)
+            return emoji_pattern.findall(str(message))
+
 def emoji_helper(selected_user, df):
     if df.empty:
         return pd.DataFrame()
@@ -138,23 +158,7 @@ def emoji_helper(selected_user, df):
     emojis = []
     for message in df['message']:
         if pd.notna(message):
-            # Updated emoji detection for newer emoji library versions
-            try:
-                emojis.extend([c for c in str(message) if c in emoji.EMOJI_DATA])
-            except:
-                # Fallback for older versions
-                try:
-                    emojis.extend([c for c in str(message) if c in emoji.UNICODE_EMOJI['en']])
-                except:
-                    # Simple emoji detection as fallback
-                    import re
-                    emoji_pattern = re.compile("["
-                        u"\U0001F600-\U0001F64F"  # emoticons
-                        u"\U0001F300-\U0001F5FF"  # symbols & pictographs
-                        u"\U0001F680-\U0001F6FF"  # transport & map symbols
-                        u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
-                        "]+", flags=re.UNICODE)
-                    emojis.extend(emoji_pattern.findall(str(message)))
+            emojis.extend(extract_emojis(message))
 
     if not emojis:
         return pd.DataFrame()
@@ -229,4 +233,71 @@ def activity_heatmap(selected_user, df):
         return pd.DataFrame()
     
     user_heatmap = df.pivot_table(index='day_name', columns='period', values='message', aggfunc='count').fillna(0)
-    return user_heatmap
\ No newline at end of file
+    return user_heatmap
+
+def sketch_chat(messages):
+    """Stream (user, message) pairs into one chat-wide sketch plus lightweight per-user sketches"""
+    stop_words = get_stop_words()
+    overall = ChatSketch()
+    sketches = {}
+
+    for user, message in messages:
+        user_sketch = sketches.get(user)
+        if user_sketch is None:
+            user_sketch = sketches[user] = ChatSketch.lightweight()
+
+        links = extract.find_urls(message)
+        emojis = extract_emojis(message)
+        media = '<Media omitted>' in message
+        words = []
+        if not media and user != 'group_notification':
+            words = [word for word in message.lower().split() if word not in stop_words and len(word) > 2]
+
+        # Feed both sketches here so the overall view never has to merge every participant
+        for sketch in (overall, user_sketch):
+            sketch.messages += 1
+            sketch.words += len(message.split())
+            sketch.media += media
+            for link in links:
+                sketch.add_link(link)
+            for e in emojis:
+                sketch.add_emoji(e)
+            for word in words:
+                sketch.add_word(word)
+
+    return overall, sketches
+
+def select_sketch(selected_user, overall, sketches):
+    if selected_user != 'Overall':
+        return sketches.get(selected_user, ChatSketch.lightweight())
+    return overall
+
+def approx_fetch_stats(sketch):
+    return (sketch.messages, sketch.words, sketch.media, sketch.links,
+            sketch.distinct_words.count(), sketch.distinct_links.count())
+
+def _approx_top(summary, counts, n):
+    rows = []
+    for item, count, error in summary.top(n):
+        # Both sketches only ever overcount, so the smaller estimate is the tighter one
+        estimate = min(count, counts.estimate(item)) if counts is not None else count
+        rows.append((item, estimate, estimate - max(count - error, 0)))
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return pd.DataFrame(rows)
+
+def approx_most_common_words(sketch):
+    return _approx_top(sketch.top_words, sketch.word_counts, 20)
+
+def approx_emoji_helper(sketch):
+    return _approx_top(sketch.top_emojis, sketch.emoji_counts, None)
+
+def approx_wordcloud(sketch):
+    text = " ".join(sketch.word_sample.items)
+    if not text.strip():
+        return None
+
+    try:
+        wc = WordCloud(width=500, height=500, min_font_size=10, background_color='white')
+        return wc.generate(text)
+    except:
+        return None
\ No newline at end of file
@@ -0,0 +1,99 @@
+import pandas as pd
+
+# Default inactivity gap (in minutes) that splits a chat into separate conversations
+DEFAULT_SESSION_GAP = 60
+
+def prepare_interactions(df, gap_minutes=DEFAULT_SESSION_GAP):
+    """Tag sessions and replies in export order using vectorized shifts"""
+    if df.empty:
+        return pd.DataFrame(columns=['date', 'user', 'gap', 'session', 'replied_to', 'is_reply'])
+
+    # The export order is the true message order, so it is kept as is rather than re-sorted by timestamp
+    temp = df[df['user'] != 'group_notification'][['date', 'user']].reset_index(drop=True)
+
+    # Clock changes can make a timestamp go backwards; treat that as an instant reply
+    temp['gap'] = temp['date'].diff().clip(lower=pd.Timedelta(0))
+    new_session = temp['gap'].isna() | (temp['gap'] > pd.Timedelta(minutes=gap_minutes))
+    temp['session'] = new_session.cumsum() - 1
+
+    # A reply is the next message in the same session written by someone else
+    temp['replied_to'] = temp['user'].shift()
+    temp['is_reply'] = ~new_session & (temp['user'] != temp['replied_to'])
+
+    return temp
+
+def conversation_sessions(temp):
+    if temp.empty:
+        return pd.DataFrame()
+
+    sessions = temp.groupby('session').agg(
+        start=('date', 'min'),
+        end=('date', 'max'),
+        messages=('user', 'size'),
+        participants=('user', 'nunique'),
+        initiator=('user', 'first'),
+    )
+    sessions['duration_min'] = (sessions['end'] - sessions['start']).dt.total_seconds() / 60
+    return sessions.reset_index()
+
+def reply_latency(temp):
+    if temp.empty:
+        return pd.DataFrame()
+
+    replies = temp[temp['is_reply']]
+    if replies.empty:
+        return pd.DataFrame()
+
+    minutes = replies['gap'].dt.total_seconds() / 60
+    latency = minutes.groupby(replies['user']).agg(['count', 'median', 'mean'])
+    latency.columns = ['replies', 'median_min', 'mean_min']
+    latency.index.name = 'user'
+    return latency.round(2).sort_values('median_min')
+
+def median_reply_time(temp):
+    if temp.empty or not temp['is_reply'].any():
+        return None
+
+    # Median over every reply in the chat, not a median of per-user medians
+    return temp.loc[temp['is_reply'], 'gap'].dt.total_seconds().median() / 60
+
+def reply_matrix(temp):
+    if temp.empty:
+        return pd.DataFrame()
+
+    replies = temp[temp['is_reply']]
+    if replies.empty:
+        return pd.DataFrame()
+
+    # Rows are the user replying, columns are the user being replied to
+    return pd.crosstab(replies['user'], replies['replied_to'])
+
+def activity_streaks(temp):
+    if temp.empty:
+        return pd.DataFrame()
+
+    days = pd.DataFrame({'user': temp['user'], 'day': temp['date'].dt.normalize()})
+    days = days.drop_duplicates().sort_values(['user', 'day'], kind='mergesort').reset_index(drop=True)
+
+    # A new run starts whenever the user changes or a calendar day is skipped
+    new_run = (days['user'] != days['user'].shift()) | (days['day'].diff() != pd.Timedelta(days=1))
+    days['run'] = new_run.cumsum()
+
+    runs = days.groupby('run').agg(user=('user', 'first'), length=('day', 'size'), last_day=('day', 'max'))
+    last_chat_day = days['day'].max()
+
+    streaks = runs.groupby('user').agg(active_days=('length', 'sum'), longest_streak=('length', 'max'))
+    current = runs[runs['last_day'] == last_chat_day].set_index('user')['length']
+    streaks['current_streak'] = current.reindex(streaks.index).fillna(0).astype(int)
+    return streaks.sort_values('longest_streak', ascending=False)
+
+def compute_interactions(df, gap_minutes=DEFAULT_SESSION_GAP):
+    """Build every interaction aggregate from a single pass over the chat"""
+    temp = prepare_interactions(df, gap_minutes)
+    return {
+        'sessions': conversation_sessions(temp),
+        'latency': reply_latency(temp),
+        'median_reply': median_reply_time(temp),
+        'matrix': reply_matrix(temp),
+        'streaks': activity_streaks(temp),
+    }
@@ -1,20 +1,59 @@
 import re
 import pandas as pd
 
+# Multiple patterns to handle different WhatsApp export formats
+PATTERNS = [
+    r'\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2}\s-\s',  # DD/MM/YYYY, HH:MM - 
+    r'\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2}\s[AP]M\s-\s',  # DD/MM/YYYY, HH:MM AM/PM - 
+    r'\[\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2}:\d{2}\s[AP]M\]',  # [DD/MM/YYYY, HH:MM:SS AM/PM]
+    r'\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2}:\d{2}\s-\s'  # DD/MM/YYYY, HH:MM:SS - 
+]
+
+def strip_marks(text):
+    # A leading BOM or the left-to-right marks iOS puts before timestamps would hide them from the patterns
+    return text.replace('\ufeff', '').replace('\u200e', '')
+
+def split_user_message(message):
+    # Improved regex to handle different name formats
+    entry = re.split(r'(.*?):\s', message, maxsplit=1)
+    if len(entry) >= 3 and entry[1].strip():  # user name exists
+        return entry[1].strip(), entry[2] if len(entry) > 2 else ""
+    return 'group_notification', message.strip()
+
+def stream_messages(lines):
+    """Yield (user, message) pairs line by line without holding the whole chat in memory"""
+    compiled = [re.compile(pattern) for pattern in PATTERNS]
+    pattern = None
+    current = None
+
+    for line in lines:
+        line = strip_marks(line)
+
+        # Lock onto the first export format that matches, as preprocess does
+        if pattern is None:
+            pattern = next((candidate for candidate in compiled if candidate.match(line)), None)
+            if pattern is None:
+                continue
+
+        match = pattern.match(line)
+        if match:
+            if current is not None:
+                yield split_user_message(current)
+            current = line[match.end():]
+        elif current is not None:
+            # Multi-line messages continue until the next timestamp
+            current += line
+
+    if current is not None:
+        yield split_user_message(current)
+
 def preprocess(data):
-    # Multiple patterns to handle different WhatsApp export formats
-    patterns = [
-        r'\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2}\s-\s',  # DD/MM/YYYY, HH:MM - 
-        r'\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2}\s[AP]M\s-\s',  # DD/MM/YYYY, HH:MM AM/PM - 
-        r'\[\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2}:\d{2}\s[AP]M\]',  # [DD/MM/YYYY, HH:MM:SS AM/PM]
-        r'\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2}:\d{2}\s-\s'  # DD/MM/YYYY, HH:MM:SS - 
-    ]
-    
+    data = strip_marks(data)
     messages = []
     dates = []
     
     # Try each pattern
-    for pattern in patterns:
+    for pattern in PATTERNS:
         messages = re.split(pattern, data)[1:]
         dates = re.findall(pattern, data)
         if messages and dates:
@@ -27,33 +66,42 @@ def preprocess(data):
     # Create initial dataframe
     df = pd.DataFrame({'user_message': messages, 'message_date': dates})
     
-    # Clean message_date by removing brackets and extra characters
-    df['message_date'] = df['message_date'].str.replace('[', '').str.replace(']', '').str.strip()
+    # Clean message_date down to the bare timestamp, e.g. "12/03/2023, 1:05 PM"
+    df['message_date'] = (df['message_date'].str.replace('[', '').str.replace(']', '')
+                          .str.replace('\u202f', ' ').str.strip().str.rstrip('-').str.strip())
     
-    # Try different date formats
+    # Exports use either a 2 or 4 digit year
+    year = '%Y' if len(df['message_date'].iloc[0].split(',')[0].split('/')[-1]) == 4 else '%y'
+
+    # Try different date formats, day-first before month-first
     date_formats = [
-        '%d/%m/%Y, %H:%M - ',
-        '%d/%m/%Y, %H:%M %p - ',
-        '%d/%m/%Y, %H:%M:%S - ',
-        '%d/%m/%Y, %H:%M:%S %p',
-        '%m/%d/%Y, %H:%M - ',
-        '%m/%d/%Y, %H:%M %p - '
+        f'%d/%m/{year}, %H:%M',
+        f'%d/%m/{year}, %I:%M %p',
+        f'%d/%m/{year}, %H:%M:%S',
+        f'%d/%m/{year}, %I:%M:%S %p',
+        f'%m/%d/{year}, %H:%M',
+        f'%m/%d/{year}, %I:%M %p',
+        f'%m/%d/{year}, %H:%M:%S',
+        f'%m/%d/{year}, %I:%M:%S %p'
     ]
     
+    parsed = None
     for fmt in date_formats:
         try:
-            df['message_date'] = pd.to_datetime(df['message_date'], format=fmt)
+            parsed = pd.to_datetime(df['message_date'], format=fmt)
             break
         except:
             continue
     
     # If date parsing fails, try without format
-    if df['message_date'].dtype == 'object':
+    if parsed is None:
         try:
-            df['message_date'] = pd.to_datetime(df['message_date'], infer_datetime_format=True)
+            parsed = pd.to_datetime(df['message_date'])
         except:
-            # If all fails, create dummy dates
-            df['message_date'] = pd.date_range(start='2020-01-01', periods=len(df), freq='H')
+            # If all fails, create dummy dates and flag them so time-based metrics can be hidden
+            parsed = pd.date_range(start='2020-01-01', periods=len(df), freq='h')
+            df.attrs['synthetic_dates'] = True
+    df['message_date'] = parsed
     
     df.rename(columns={'message_date': 'date'}, inplace=True)
 
@@ -61,14 +109,9 @@ def preprocess(data):
     messages = []
     
     for message in df['user_message']:
-        # Improved regex to handle different name formats
-        entry = re.split(r'(.*?):\s', message, maxsplit=1)
-        if len(entry) >= 3 and entry[1].strip():  # user name exists
-            users.append(entry[1].strip())
-            messages.append(entry[2] if len(entry) > 2 else "")
-        else:
-            users.append('group_notification')
-            messages.append(message.strip())
+        user, text = split_user_message(message)
+        users.append(user)
+        messages.append(text)
 
     df['user'] = users
     df['message'] = messages
@@ -0,0 +1,262 @@
+import hashlib
+import heapq
+import math
+import random
+from array import array
+
+def _hash64(item):
+    """Stable 64-bit hash so sketches built in different processes can be merged"""
+    return int.from_bytes(hashlib.blake2b(str(item).encode('utf-8'), digest_size=8).digest(), 'little')
+
+class CountMinSketch:
+    """Frequency estimates that never undercount and overcount by at most epsilon * total with probability 1 - delta"""
+
+    def __init__(self, epsilon=0.001, delta=0.01):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.tables = [array('q', [0]) * self.width for _ in range(self.depth)]
+        self.total = 0
+
+    def _indexes(self, item):
+        # Derive every row's index from one hash (Kirsch-Mitzenmacher double hashing)
+        h = _hash64(item)
+        h1 = h & 0xFFFFFFFF
+        h2 = (h >> 32) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, item, count=1):
+        self.total += count
+        for table, index in zip(self.tables, self._indexes(item)):
+            table[index] += count
+
+    def estimate(self, item):
+        return min(table[index] for table, index in zip(self.tables, self._indexes(item)))
+
+    def merge(self, other):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Count-Min sketches must have the same width and depth to merge")
+        for table, other_table in zip(self.tables, other.tables):
+            for i, value in enumerate(other_table):
+                if value:
+                    table[i] += value
+        self.total += other.total
+        return self
+
+class SpaceSaving:
+    """Top-k heavy hitters; each reported count overcounts by at most total / k"""
+
+    def __init__(self, k=200):
+        self.k = k
+        self.counters = {}  # item -> [count, max overcount]
+        self._heap = []
+        self.total = 0
+
+    def _floor(self):
+        if len(self.counters) < self.k:
+            return 0
+        return min(count for count, _ in self.counters.values())
+
+    def _rebuild_heap(self):
+        self._heap = [(count, item) for item, (count, _) in self.counters.items()]
+        heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        # Heap entries go stale when counts grow, so refresh them lazily on the way out
+        while True:
+            count, item = heapq.heappop(self._heap)
+            counter = self.counters.get(item)
+            if counter is None:
+                continue
+            if counter[0] == count:
+                del self.counters[item]
+                return count
+            heapq.heappush(self._heap, (counter[0], item))
+
+    def add(self, item, count=1):
+        self.total += count
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += count
+            return
+
+        floor = 0
+        if len(self.counters) >= self.k:
+            floor = self._pop_min()
+        self.counters[item] = [floor + count, floor]
+        heapq.heappush(self._heap, (floor + count, item))
+
+    def top(self, n=None):
+        """Return (item, count, max overcount) tuples, most frequent first"""
+        ranked = sorted(((item, count, error) for item, (count, error) in self.counters.items()),
+                        key=lambda entry: entry[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def merge(self, other):
+        if self.k != other.k:
+            raise ValueError("Space-Saving summaries must track the same number of counters to merge")
+        # Items missing from one summary may have been evicted there, so assume its floor count
+        floor, other_floor = self._floor(), other._floor()
+        merged = {}
+        for item in set(self.counters) | set(other.counters):
+            count, error = self.counters.get(item, (floor, floor))
+            other_count, other_error = other.counters.get(item, (other_floor, other_floor))
+            merged[item] = [count + other_count, error + other_error]
+
+        keep = heapq.nlargest(self.k, merged.items(), key=lambda entry: entry[1][0])
+        self.counters = {item: counter for item, counter in keep}
+        self.total += other.total
+        self._rebuild_heap()
+        return self
+
+class HyperLogLog:
+    """Distinct-count estimate with a relative standard error of 1.04 / sqrt(2 ** p)"""
+
+    def __init__(self, p=12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(self.m)
+
+    @property
+    def standard_error(self):
+        return 1.04 / math.sqrt(self.m)
+
+    def add(self, item):
+        h = _hash64(item)
+        index = h >> (64 - self.p)
+        remainder = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        # Small cardinalities are more accurate with linear counting
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+    def merge(self, other):
+        if self.p != other.p:
+            raise ValueError("HyperLogLog sketches must have the same precision to merge")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+        return self
+
+class ReservoirSample:
+    """Uniform random sample of at most k items from a stream of any length"""
+
+    def __init__(self, k=5000, seed=None):
+        self.k = k
+        self.items = []
+        self.seen = 0
+        self._rng = random.Random(seed)
+
+    def add(self, item):
+        self.seen += 1
+        if len(self.items) < self.k:
+            self.items.append(item)
+        else:
+            j = self._rng.randrange(self.seen)
+            if j < self.k:
+                self.items[j] = item
+
+    def merge(self, other):
+        if self.k != other.k:
+            raise ValueError("Reservoir samples must have the same size to merge")
+        # Draw from both samples in proportion to how many items each one stands for
+        ours, theirs = list(self.items), list(other.items)
+        self._rng.shuffle(ours)
+        self._rng.shuffle(theirs)
+        remaining, other_remaining = self.seen, other.seen
+
+        merged = []
+        while len(merged) < self.k and (ours or theirs):
+            if theirs and (not ours or self._rng.random() * (remaining + other_remaining) >= remaining):
+                merged.append(theirs.pop())
+                other_remaining -= 1
+            else:
+                merged.append(ours.pop())
+                remaining -= 1
+
+        self.items = merged
+        self.seen += other.seen
+        return self
+
+def _overcount_bound(summary, counts):
+    # Space-Saving's bound always holds; Count-Min's only holds with probability 1 - delta
+    bound = summary.total / summary.k
+    if counts is not None and counts.epsilon * counts.total < bound:
+        return counts.epsilon * counts.total, 1 - counts.delta
+    return bound, 1.0
+
+class ChatSketch:
+    """Bounded-memory summary of a whole chat, or a lightweight one for a single participant"""
+
+    def __init__(self, top_k=200, epsilon=0.001, delta=0.01, precision=12, sample_size=5000):
+        self.messages = 0
+        self.words = 0
+        self.media = 0
+        self.links = 0
+        self.top_words = SpaceSaving(top_k)
+        self.top_emojis = SpaceSaving(top_k)
+        # Count-Min tables are the largest part, so per-user sketches pass epsilon=None to skip them
+        self.word_counts = CountMinSketch(epsilon, delta) if epsilon else None
+        self.emoji_counts = CountMinSketch(epsilon, delta) if epsilon else None
+        self.distinct_words = HyperLogLog(precision)
+        self.distinct_links = HyperLogLog(precision)
+        self.word_sample = ReservoirSample(sample_size)
+
+    @classmethod
+    def lightweight(cls):
+        """Per-user sketch: a few KB no matter how much that participant writes"""
+        return cls(top_k=50, epsilon=None, precision=10, sample_size=500)
+
+    def add_word(self, word):
+        self.top_words.add(word)
+        if self.word_counts is not None:
+            self.word_counts.add(word)
+        self.distinct_words.add(word)
+        self.word_sample.add(word)
+
+    def add_emoji(self, emoji):
+        self.top_emojis.add(emoji)
+        if self.emoji_counts is not None:
+            self.emoji_counts.add(emoji)
+
+    def add_link(self, link):
+        self.links += 1
+        self.distinct_links.add(link)
+
+    def merge(self, other):
+        if (self.word_counts is None) != (other.word_counts is None):
+            raise ValueError("Only sketches of the same kind can be merged")
+        self.messages += other.messages
+        self.words += other.words
+        self.media += other.media
+        self.links += other.links
+        self.top_words.merge(other.top_words)
+        self.top_emojis.merge(other.top_emojis)
+        if self.word_counts is not None:
+            self.word_counts.merge(other.word_counts)
+            self.emoji_counts.merge(other.emoji_counts)
+        self.distinct_words.merge(other.distinct_words)
+        self.distinct_links.merge(other.distinct_links)
+        self.word_sample.merge(other.word_sample)
+        return self
+
+    def error_bounds(self):
+        """Worst-case error of each approximate figure for the data seen so far"""
+        top_words, words_confidence = _overcount_bound(self.top_words, self.word_counts)
+        top_emojis, emojis_confidence = _overcount_bound(self.top_emojis, self.emoji_counts)
+        return {
+            'top_words': top_words,
+            'top_words_confidence': words_confidence,
+            'top_emojis': top_emojis,
+            'top_emojis_confidence': emojis_confidence,
+            'distinct': self.distinct_words.standard_error,
+            'sample_size': len(self.word_sample.items),
+            'sampled_from': self.word_sample.seen,
+        }
@@ -0,0 +1,70 @@
+import io
+from collections import Counter
+
+import pytest
+
+import helper
+import preprocessor
+from sketches import ChatSketch, SpaceSaving
+
+ANDROID_CHAT = (
+    "\ufeff12/03/2023, 10:15 - Messages and calls are end-to-end encrypted.\r\n"
+    "12/03/2023, 10:16 - Alice: hello everyone, check https://example.com 😀\r\n"
+    "and this second line\r\n"
+    "12/03/2023, 10:20 - Bob: <Media omitted>\r\n"
+    "12/03/2023, 13:05 - Bob: sounds great 👍👍\r\n"
+)
+
+IOS_CHAT = (
+    "\ufeff[12/01/2023, 12:55:01 PM] Alice: lunch today?\n"
+    "\u200e[12/01/2023, 12:56:01 PM] Bob: \u200eimage omitted\n"
+    "[12/01/2023, 1:02:11 PM] Bob: yes, meet at www.example.org\n"
+    "second line from bob 🍕\n"
+)
+
+@pytest.mark.parametrize('data', [ANDROID_CHAT, IOS_CHAT])
+def test_stream_matches_exact_stats(data):
+    df = preprocessor.preprocess(data)
+    overall, sketches = helper.sketch_chat(preprocessor.stream_messages(io.StringIO(data)))
+
+    assert helper.approx_fetch_stats(overall)[:4] == helper.fetch_stats('Overall', df)
+    assert set(sketches) == set(df['user'])
+    for user, sketch in sketches.items():
+        assert helper.approx_fetch_stats(sketch)[:4] == helper.fetch_stats(user, df)
+
+def test_merge_rejects_different_sizes():
+    with pytest.raises(ValueError):
+        SpaceSaving(k=50).merge(SpaceSaving(k=200))
+    with pytest.raises(ValueError):
+        ChatSketch().merge(ChatSketch(top_k=50))
+    with pytest.raises(ValueError):
+        ChatSketch().merge(ChatSketch.lightweight())
+
+def test_error_bounds_report_which_term_applies():
+    sketch = ChatSketch()
+    for i in range(1000):
+        sketch.add_word(f"word{i % 10}")
+    # Count-Min's 0.001 * 1000 = 1 beats Space-Saving's 1000 / 200 = 5, so the bound is probabilistic
+    bounds = sketch.error_bounds()
+    assert bounds['top_words'] == 1
+    assert bounds['top_words_confidence'] == 0.99
+
+    light = ChatSketch.lightweight()
+    for i in range(1000):
+        light.add_word(f"word{i % 10}")
+    # Without Count-Min only the deterministic 1000 / 50 bound is left
+    bounds = light.error_bounds()
+    assert bounds['top_words'] == 20
+    assert bounds['top_words_confidence'] == 1
+
+def test_approx_top_never_undercounts_and_is_sorted():
+    sketch = ChatSketch.lightweight()
+    words = [f"word{i}" for i in range(200) for _ in range(200 - i)]
+    for word in words:
+        sketch.add_word(word)
+
+    top = helper.approx_most_common_words(sketch)
+    assert top[1].is_monotonic_decreasing
+    true_counts = Counter(words)
+    for word, estimate, overcount in top.itertuples(index=False):
+        assert estimate - overcount <= true_counts[word] <= estimate
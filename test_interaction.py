@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+import interaction
+import preprocessor
+
+CHAT = (
+    "12/03/2023, 10:00 - Alice: morning\n"
+    "12/03/2023, 10:02 - Bob: hey\n"
+    "12/03/2023, 10:03 - Bob: how are you\n"
+    "12/03/2023, 10:13 - Alice: good\n"
+    "12/03/2023, 10:14 - Carl: same here\n"
+    "12/03/2023, 13:00 - Bob: anyone for lunch?\n"
+    "12/03/2023, 13:30 - Alice: me\n"
+    "13/03/2023, 09:00 - Alice: new day\n"
+    "15/03/2023, 09:00 - Alice: back again\n"
+    "15/03/2023, 09:05 - Bob: welcome back\n"
+)
+
+def prepared(gap_minutes=60):
+    df = preprocessor.preprocess(CHAT)
+    return interaction.prepare_interactions(df[['date', 'user']], gap_minutes)
+
+def test_gap_starts_new_session_without_reply():
+    temp = prepared()
+    # 10:14 -> 13:00 and 13:30 -> next morning are longer than the 60 minute gap
+    assert temp['session'].tolist() == [0, 0, 0, 0, 0, 1, 1, 2, 3, 3]
+    assert not temp.loc[5, 'is_reply']
+    assert not temp.loc[7, 'is_reply']
+
+def test_consecutive_message_from_same_sender_is_not_reply():
+    temp = prepared()
+    assert temp.loc[1, 'is_reply']
+    assert not temp.loc[2, 'is_reply']
+
+def test_reply_matrix_maps_replier_to_replied_to():
+    temp = prepared()
+    assert temp.loc[4, 'replied_to'] == 'Alice'
+
+    matrix = interaction.reply_matrix(temp)
+    assert matrix.loc['Bob', 'Alice'] == 2
+    assert matrix.loc['Alice', 'Bob'] == 2
+    assert matrix.loc['Carl', 'Alice'] == 1
+    assert matrix.values.sum() == 5
+
+def test_median_reply_time_uses_all_reply_gaps():
+    temp = prepared()
+    # Reply gaps are 2, 10, 1, 30, 5 minutes; a median of per-user medians would give median(20, 3.5, 1) = 3.5
+    assert interaction.median_reply_time(temp) == 5
+    latency = interaction.reply_latency(temp)
+    assert latency.loc['Alice', 'median_min'] == 20
+    assert latency.loc['Bob', 'median_min'] == 3.5
+
+def test_activity_streaks_across_skipped_day():
+    streaks = interaction.activity_streaks(prepared())
+    # Alice is active 12th, 13th and 15th; Bob 12th and 15th; Carl only on the 12th
+    assert streaks.loc['Alice', 'longest_streak'] == 2
+    assert streaks.loc['Alice', 'current_streak'] == 1
+    assert streaks.loc['Alice', 'active_days'] == 3
+    assert streaks.loc['Bob', 'longest_streak'] == 1
+    assert streaks.loc['Bob', 'current_streak'] == 1
+    assert streaks.loc['Carl', 'current_streak'] == 0
+
+@pytest.mark.parametrize('data, expected', [
+    ("12/03/2023, 13:05 - Alice: hi\n", '2023-03-12 13:05'),
+    ("12/03/2023, 1:05 PM - Alice: hi\n", '2023-03-12 13:05'),
+    ("12/03/23, 1:05 AM - Alice: hi\n", '2023-03-12 01:05'),
+    ("12/03/2023, 1:05\u202fPM - Alice: hi\n", '2023-03-12 13:05'),
+    ("12/25/2023, 9:15 PM - Alice: hi\n", '2023-12-25 21:15'),
+    ("[12/01/2023, 1:05:01 PM] Alice: hi\n", '2023-01-12 13:05:01'),
+])
+def test_preprocess_parses_real_timestamps(data, expected):
+    df = preprocessor.preprocess(data)
+    assert df.loc[0, 'date'] == pd.Timestamp(expected)
+    assert df.loc[0, 'user'] == 'Alice'
+    assert 'synthetic_dates' not in df.attrs
+
+def test_preprocess_flags_synthetic_dates():
+    df = preprocessor.preprocess("31/31/2023, 10:15 - Alice: hi\n")
+    assert df.attrs.get('synthetic_dates')